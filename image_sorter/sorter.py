@@ -2,82 +2,183 @@ import os
 import shutil
 from datetime import datetime
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from PIL import Image, UnidentifiedImageError
-from moviepy.editor import VideoFileClip
 import re
-from datetime import datetime
+import struct
 
-def get_media_date(media_path):
-    if media_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-        return get_image_date(media_path)
-    elif media_path.lower().endswith(('.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv')):
-        return get_video_date(media_path)
-    return None
+def unjoined_layout(date_format):
+    # Separated layouts have their groups joined without separators and then checked
+    # against a format that expects them, so they never yield a date (as with strptime)
+    def build_date(m):
+        raise ValueError(f"time data {''.join(m.groups())!r} does not match format {date_format!r}")
+    return build_date
+
+# Simplified and ordered patterns, compiled once at import, each paired with a
+# constructor that builds the datetime straight from the captured groups
+DATE_PATTERNS = [
+    (re.compile(r'(\d{4})(\d{2})(\d{2})'), lambda m: datetime(int(m[1]), int(m[2]), int(m[3]))),  # YYYYMMDD
+    (re.compile(r'(\d{2})(\d{2})(\d{4})'), lambda m: datetime(int(m[3]), int(m[1]), int(m[2]))),  # MMDDYYYY
+    (re.compile(r'(\d{4})[-/\.](\d{2})[-/\.](\d{2})'), unjoined_layout('%Y-%m-%d')),                 # YYYY-MM-DD
+    (re.compile(r'(\d{2})[-/\.](\d{2})[-/\.](\d{4})'), unjoined_layout('%d-%m-%Y')),                 # DD-MM-YYYY
+    (re.compile(r'(\d{2})[-/\.](\d{2})[-/\.](\d{2})'), unjoined_layout('%y-%m-%d')),                 # YY-MM-DD
+    (re.compile(r'(\d{2})[-/\.](\d{2})[-/\.](\d{2})'), unjoined_layout('%d-%m-%y'))                  # DD-MM-YY
+]
 
 def get_filename_date(media_path):
     filename = os.path.basename(media_path)
-    # Simplified and ordered patterns
-    date_patterns = [
-        (r'(\d{4})(\d{2})(\d{2})', '%Y%m%d'),                # YYYYMMDD
-        (r'(\d{2})(\d{2})(\d{4})', '%m%d%Y'),                # MMDDYYYY
-        (r'(\d{4})[-/\.](\d{2})[-/\.](\d{2})', '%Y-%m-%d'),  # YYYY-MM-DD
-        (r'(\d{2})[-/\.](\d{2})[-/\.](\d{4})', '%d-%m-%Y'),  # DD-MM-YYYY
-        (r'(\d{2})[-/\.](\d{2})[-/\.](\d{2})', '%y-%m-%d'),  # YY-MM-DD
-        (r'(\d{2})[-/\.](\d{2})[-/\.](\d{2})', '%d-%m-%y')   # DD-MM-YY
-    ]
-    for pattern, date_format in date_patterns:
-        match = re.search(pattern, filename)
+    for pattern, build_date in DATE_PATTERNS:
+        match = pattern.search(filename)
         if match:
             try:
-                return datetime.strptime(''.join(match.groups()), date_format)
+                return build_date(match)
             except ValueError as e:
                 print(f"Date parsing error in file {filename}: {e}")
                 continue  # Continue trying other patterns if one fails
     print(f"No valid date found in filename {filename}")
     return None
 
+def parse_exif_date(date_str):
+    # EXIF dates have a fixed "YYYY:MM:DD HH:MM:SS" layout, so slice the fields directly
+    if (len(date_str) == 19 and date_str[4] == date_str[7] == ':' and date_str[10] == ' '
+            and date_str[13] == date_str[16] == ':'):
+        return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+                        int(date_str[11:13]), int(date_str[14:16]), int(date_str[17:19]))
+    return datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S")  # Non-padded or malformed values
+
 def get_image_date(image_path):
     try:
         with Image.open(image_path) as img:
-            exif_data = img._getexif()
-            if exif_data:
-                date_str = exif_data.get(36867)
-                if date_str:
-                    return datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S")
+            if img.format == "PNG":
+                # PNG's getexif() decodes the whole image to find an eXIf chunk placed after
+                # the pixel data, so only look when Exif (an eXIf chunk or ImageMagick's raw
+                # profile text chunk) was already seen in the header, and read it with the
+                # base implementation, which parses img.info without loading pixels
+                if "exif" not in img.info and "Raw profile type exif" not in img.info:
+                    return None
+                exif = Image.Image.getexif(img)
+            else:
+                exif = img.getexif()
+            # DateTimeOriginal lives in the Exif sub-IFD
+            date_str = exif.get_ifd(0x8769).get(36867)
+            if date_str:
+                return parse_exif_date(date_str)
     except UnidentifiedImageError:
         pass
     except Exception as e:
         print(f"Error processing {image_path}: {e}")
     return None
 
+# MP4/QuickTime timestamps count seconds from 1904-01-01 UTC, this many before the Unix epoch
+MP4_EPOCH_OFFSET = 2082844800
+
+def find_mp4_box(f, start, end, box_type):
+    # Walk sibling boxes between start and end, seeking over payloads (e.g. mdat)
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, kind = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return None
+        if kind == box_type:
+            return offset + header_size, offset + size
+        offset += size
+    return None
+
+def get_mp4_creation_date(video_path):
+    with open(video_path, "rb") as f:
+        moov = find_mp4_box(f, 0, os.fstat(f.fileno()).st_size, b"moov")
+        if not moov:
+            return None
+        mvhd = find_mp4_box(f, moov[0], moov[1], b"mvhd")
+        if not mvhd:
+            return None
+        f.seek(mvhd[0])
+        version = f.read(4)[0]
+        if version == 1:
+            creation_time = struct.unpack(">Q", f.read(8))[0]
+        else:
+            creation_time = struct.unpack(">I", f.read(4))[0]
+    if creation_time:
+        # Convert from UTC to local wall-clock time, the clock EXIF and filename dates use,
+        # so a shoot near a month boundary lands in one folder whatever the source
+        return datetime.fromtimestamp(creation_time - MP4_EPOCH_OFFSET)
+    return None
+
 def get_video_date(video_path):
+    # Read the container's own header instead of opening the clip with ffmpeg
+    if media_ext(video_path) in ('.mp4', '.mov'):
+        try:
+            date = get_mp4_creation_date(video_path)
+            if date:
+                return date
+        except (OSError, IndexError, OverflowError, ValueError, struct.error) as e:
+            print(f"Error processing {video_path}: {e}")
+    return get_filename_date(video_path)
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+VIDEO_EXTS = ('.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv')
+# One lookup picks the date extractor and doubles as the media-file test
+EXT_DISPATCH = {**dict.fromkeys(IMAGE_EXTS, get_image_date), **dict.fromkeys(VIDEO_EXTS, get_video_date)}
+
+def media_ext(name):
+    # Text from the last dot on, lowercased; names without a dot never match EXT_DISPATCH
+    return name[name.rfind('.'):].lower()
+
+def get_media_date(media_path):
+    get_date = EXT_DISPATCH.get(media_ext(media_path))
+    return get_date(media_path) if get_date else None
+
+def gather_media(folder, filter_pxl=False):
+    # Walk with os.scandir directly: DirEntry carries the name and file type from the
+    # directory listing, and both filters are applied in the same pass
+    media_paths, subdirs = [], []
     try:
-        with VideoFileClip(video_path) as video:
-            date_str = video.creation_date
-            if date_str:
-                return datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-    except Exception as e:
-        return get_filename_date(video_path)
-    return None
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():  # Don't follow directory links, like os.walk
+                        subdirs.append(entry.path)
+                elif media_ext(entry.name) in EXT_DISPATCH:
+                    if not filter_pxl or entry.name.startswith("PXL"):
+                        media_paths.append(entry.path)
+    except OSError:
+        pass  # Unreadable directories are skipped, like os.walk does
+    yield from media_paths
+    for subdir in subdirs:
+        yield from gather_media(subdir, filter_pxl)
 
 def sort_media(source_dir, dest_dir, qualifier=None, dry_run=False, filter_pxl=False):
-    media_paths = [os.path.join(dp, f) for dp, dn, filenames in os.walk(source_dir) for f in filenames if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv'))]
-    
-    if filter_pxl:
-        media_paths = [path for path in media_paths if os.path.basename(path).startswith("PXL")]
-    
-    for media_path in tqdm(media_paths, desc="Sorting Media"):
-        date = get_media_date(media_path) 
-        if date:
-            if qualifier:
-                new_dir = os.path.join(dest_dir, f"{date.year}/{date.month:02}/{qualifier}")
-            else:
-                new_dir = os.path.join(dest_dir, f"{date.year}/{date.month:02}")
+    media_paths = list(gather_media(source_dir, filter_pxl))
+
+    # Date extraction is IO bound (EXIF and container headers), so read dates in parallel
+    with ThreadPoolExecutor() as executor:
+        media_dates = list(tqdm(executor.map(get_media_date, media_paths), total=len(media_paths), desc="Reading Dates"))
+
+    # The qualifier sub-folder and log prefix are the same for every file, resolve them once
+    qualifier_dir = f"/{qualifier}" if qualifier else ""
+    action = "Dry Run: Moving" if dry_run else "Moving"
+
+    new_dirs = [os.path.join(dest_dir, f"{date.year}/{date.month:02}{qualifier_dir}") if date else None for date in media_dates]
+
+    # Files share a handful of year/month folders, so create each one once up front
+    if not dry_run:
+        for new_dir in set(new_dirs) - {None}:
+            os.makedirs(new_dir, exist_ok=True)
+
+    for media_path, new_dir in tqdm(zip(media_paths, new_dirs), total=len(media_paths), desc="Sorting Media"):
+        if new_dir:
+            new_path = os.path.join(new_dir, os.path.basename(media_path))
             if not dry_run:
-                os.makedirs(new_dir, exist_ok=True)
-                shutil.move(media_path, os.path.join(new_dir, os.path.basename(media_path)))
-            print(f"Dry Run: Moving {media_path} to {os.path.join(new_dir, os.path.basename(media_path))}" if dry_run else f"Moving {media_path} to {os.path.join(new_dir, os.path.basename(media_path))}")
+                shutil.move(media_path, new_path)
+            print(f"{action} {media_path} to {new_path}")
         else:
             print(f"No date found for {media_path}")
 
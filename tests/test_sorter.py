@@ -0,0 +1,109 @@
+import unittest
+from unittest import mock
+from tempfile import TemporaryDirectory
+import os
+import struct
+from datetime import datetime
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+from image_sorter.sorter import gather_media, get_filename_date, get_image_date, get_video_date, parse_exif_date, sort_media
+
+def mp4_box(kind, payload):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+class TestSorter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def test_gather_media_recurses_and_filters(self):
+        # Only media extensions are collected, from nested folders, with the optional PXL filter
+        for name in ("PXL_1.jpg", "IMG_2.JPEG", os.path.join("sub", "PXL_3.mp4"), os.path.join("sub", "notes.txt")):
+            path = os.path.join(self.temp_dir.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "wb").close()
+        found = sorted(os.path.relpath(p, self.temp_dir.name) for p in gather_media(self.temp_dir.name))
+        self.assertEqual(found, ["IMG_2.JPEG", "PXL_1.jpg", os.path.join("sub", "PXL_3.mp4")])
+        found = sorted(os.path.relpath(p, self.temp_dir.name) for p in gather_media(self.temp_dir.name, filter_pxl=True))
+        self.assertEqual(found, ["PXL_1.jpg", os.path.join("sub", "PXL_3.mp4")])
+
+    def test_get_video_date_from_mvhd(self):
+        # moov placed after mdat, as most cameras write it; 2021-06-15 12:00:00 UTC
+        video_path = os.path.join(self.temp_dir.name, "clip.mp4")
+        creation_time = int((datetime(2021, 6, 15, 12) - datetime(1904, 1, 1)).total_seconds())
+        mvhd = mp4_box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">II", creation_time, creation_time))
+        with open(video_path, "wb") as f:
+            f.write(mp4_box(b"ftyp", b"isom") + mp4_box(b"mdat", b"\x00" * 1024) + mp4_box(b"moov", mvhd))
+        # Returned in local time, matching EXIF and filename dates
+        self.assertEqual(get_video_date(video_path), datetime.fromtimestamp(creation_time - 2082844800))
+
+    def test_get_video_date_falls_back_to_filename(self):
+        # A file without a moov box should use the date in its name
+        video_path = os.path.join(self.temp_dir.name, "VID_20190102_120000.mp4")
+        with open(video_path, "wb") as f:
+            f.write(b"not a real video")
+        self.assertEqual(get_video_date(video_path), datetime(2019, 1, 2))
+
+    def test_get_filename_date_patterns(self):
+        # Compact layouts parse; separated layouts have never produced a date
+        self.assertEqual(get_filename_date("PXL_20230514_101112.jpg"), datetime(2023, 5, 14))
+        self.assertEqual(get_filename_date("scan_12312020.jpg"), datetime(2020, 12, 31))
+        self.assertIsNone(get_filename_date("trip 2023-05-14.mov"))
+        self.assertIsNone(get_filename_date("party 25.12.2020.jpg"))
+        self.assertIsNone(get_filename_date("clip 12-05-20.mp4"))
+        self.assertIsNone(get_filename_date("holiday.jpg"))
+
+    def test_get_image_date_from_exif(self):
+        image_path = os.path.join(self.temp_dir.name, "photo.jpg")
+        img = Image.new('RGB', (10, 10), color='blue')
+        exif = img.getexif()
+        exif.get_ifd(0x8769)[36867] = "2020:01:02 03:04:05"
+        img.save(image_path, exif=exif)
+        self.assertEqual(get_image_date(image_path), datetime(2020, 1, 2, 3, 4, 5))
+
+    def test_parse_exif_date_fallback_and_malformed(self):
+        # Non-padded values go through strptime; wrong separators are still rejected
+        self.assertEqual(parse_exif_date("2020:1:2 3:4:5"), datetime(2020, 1, 2, 3, 4, 5))
+        with self.assertRaises(ValueError):
+            parse_exif_date("2020-01-02T03:04:05")
+        with self.assertRaises(ValueError):
+            parse_exif_date("0000:00:00 00:00:00")
+
+    def test_get_image_date_png_without_exif_is_not_decoded(self):
+        # A PNG without an eXIf chunk in its header must not be fully loaded
+        image_path = os.path.join(self.temp_dir.name, "screenshot.png")
+        Image.new('RGB', (10, 10), color='blue').save(image_path)
+        with mock.patch("PIL.ImageFile.ImageFile.load") as load:
+            self.assertIsNone(get_image_date(image_path))
+        load.assert_not_called()
+
+    def test_get_image_date_png_raw_profile_exif(self):
+        # ImageMagick stores Exif in a hex-encoded "Raw profile type exif" text chunk
+        image_path = os.path.join(self.temp_dir.name, "converted.png")
+        exif = Image.Exif()
+        exif.get_ifd(0x8769)[36867] = "2020:01:02 03:04:05"
+        exif_bytes = b"Exif\x00\x00" + exif.tobytes()
+        png_info = PngInfo()
+        png_info.add_text("Raw profile type exif", f"\nexif\n{len(exif_bytes):8d}\n{exif_bytes.hex()}\n")
+        Image.new('RGB', (10, 10), color='blue').save(image_path, pnginfo=png_info)
+        with mock.patch("PIL.ImageFile.ImageFile.load") as load:
+            self.assertEqual(get_image_date(image_path), datetime(2020, 1, 2, 3, 4, 5))
+        load.assert_not_called()
+
+    def test_sort_media_moves_into_dated_folders(self):
+        # Two files in the same month share a folder, which is created before the moves
+        source_dir = os.path.join(self.temp_dir.name, "source")
+        dest_dir = os.path.join(self.temp_dir.name, "dest")
+        os.makedirs(source_dir)
+        for name in ("PXL_20230514_1.mp4", "PXL_20230520_2.mp4"):
+            open(os.path.join(source_dir, name), "wb").close()
+        sort_media(source_dir, dest_dir, qualifier="Trip")
+        moved_dir = os.path.join(dest_dir, "2023", "05", "Trip")
+        self.assertEqual(sorted(os.listdir(moved_dir)), ["PXL_20230514_1.mp4", "PXL_20230520_2.mp4"])
+        self.assertEqual(os.listdir(source_dir), [], "Source files should have been moved.")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()